@@ -3,20 +3,122 @@ API_Extractor.py
 Handles extraction of data from API endpoints
 """
 
-import requests
+import asyncio
+import httpx
+import ijson
+import orjson
 import logging
+import json
+import os
 from JSON_Extractor import JSONExtractor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class _ByteStream:
+    """
+    Minimal file-like reader over an iterator of byte chunks, so ijson can
+    parse an httpx streamed response incrementally
+    """
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def read(self, size=-1):
+        if size < 0:
+            return self._buffer + b''.join(self._chunks)
+
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
 class APIExtractor:
+    # Maximum number of in-flight HTTP requests during concurrent extraction
+    MAX_CONCURRENT_REQUESTS = 8
+
     def __init__(self, api_config, db_connector):
         self.api_config = api_config
         self.db_connector = db_connector
         self.json_extractor = JSONExtractor(db_connector)
-        
+
+        # One pooled HTTP/2 client: keep-alive skips per-request TCP/TLS
+        # handshakes, compressed bodies cut bytes moved, and HTTP/2 multiplexes
+        # requests to the same host over a single connection. A user-supplied
+        # transport replaces the client's own, so http2/limits must be set on
+        # the transport itself, and httpx advertises the codings it can decode
+        self.session = httpx.Client(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            transport=httpx.HTTPTransport(
+                retries=3,
+                http2=True,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
+        )
+
+        # Validator cache for conditional GETs - endpoint -> {'etag', 'last_modified'}
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        self._etag_cache_path = os.path.join(script_dir, '.api_etag_cache.json')
+        self._etag_cache = self._load_etag_cache()
+
+    def _load_etag_cache(self):
+        """
+        Load persisted ETag/Last-Modified validators from the sidecar file
+        """
+        try:
+            if os.path.exists(self._etag_cache_path):
+                with open(self._etag_cache_path, 'r') as file:
+                    return json.load(file)
+            return {}
+
+        except Exception as e:
+            logger.error(f"Error loading ETag cache: {str(e)}")
+            return {}
+
+    def _save_etag_cache(self):
+        """
+        Persist ETag/Last-Modified validators to the sidecar file
+        """
+        try:
+            with open(self._etag_cache_path, 'w') as file:
+                json.dump(self._etag_cache, file)
+
+        except Exception as e:
+            logger.error(f"Error saving ETag cache: {str(e)}")
+
+    def _conditional_headers(self, endpoint):
+        """
+        Build If-None-Match / If-Modified-Since headers from cached validators
+        """
+        headers = {}
+        cached = self._etag_cache.get(endpoint, {})
+
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        return headers
+
+    def _store_validators(self, endpoint, response_headers):
+        """
+        Remember the response validators so the next run can send a conditional GET
+        """
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+
+        if etag or last_modified:
+            self._etag_cache[endpoint] = {
+                'etag': etag,
+                'last_modified': last_modified
+            }
+            self._save_etag_cache()
+
     def make_api_request(self, endpoint):
         """
         Make HTTP request to specific endpoint with error handling
@@ -24,20 +126,20 @@ class APIExtractor:
         try:
             logger.info(f"Making API request to: {endpoint}")
             
-            # Send GET request with timeout
-            response = requests.get(endpoint, timeout=30)
+            # Send GET request (timeouts come from the shared client)
+            response = self.session.get(endpoint)
             response.raise_for_status()  # Raise an exception for bad status codes
             
-            # Parse JSON response
-            json_data = response.json()
+            # Parse JSON response with orjson (faster than stdlib json on large payloads)
+            json_data = orjson.loads(response.content)
             logger.info(f"Successfully retrieved data from {endpoint}")
             
             return json_data
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"Timeout error for endpoint: {endpoint}")
             return None
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"HTTP error for endpoint {endpoint}: {str(e)}")
             return None
         except ValueError as e:
@@ -53,25 +155,41 @@ class APIExtractor:
         """
         try:
             logger.info(f"Making API request to: {endpoint}")
-            
-            # Send GET request with timeout
-            response = requests.get(endpoint, timeout=30)
+
+            # Send GET request with timeout and cached validators so unchanged
+            # payloads come back as a body-less 304
+            response = self.session.get(
+                endpoint,
+                headers=self._conditional_headers(endpoint)
+            )
+
+            if response.status_code == 304:
+                logger.info(f"Endpoint {endpoint} not modified since last extraction")
+                return {
+                    'data': None,
+                    'status_code': 304,
+                    'headers': dict(response.headers),
+                    'not_modified': True
+                }
+
             response.raise_for_status()  # Raise an exception for bad status codes
-            
-            # Parse JSON response
-            json_data = response.json()
+
+            # Parse JSON response with orjson (faster than stdlib json on large payloads)
+            json_data = orjson.loads(response.content)
             logger.info(f"Successfully retrieved data from {endpoint} (Status: {response.status_code})")
-            
+
+            # Validators are stored by the caller once the payload has landed,
+            # so a failed load refetches on the next run
             return {
                 'data': json_data,
                 'status_code': response.status_code,
                 'headers': dict(response.headers)
             }
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"Timeout error for endpoint: {endpoint}")
             return None
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"HTTP error for endpoint {endpoint}: {str(e)}")
             return None
         except ValueError as e:
@@ -81,6 +199,63 @@ class APIExtractor:
             logger.error(f"Unexpected error for endpoint {endpoint}: {str(e)}")
             return None
         
+    async def _fetch_one(self, session, semaphore, endpoint):
+        """
+        Fetch a single endpoint within the shared session, bounded by the semaphore
+        """
+        try:
+            async with semaphore:
+                logger.info(f"Making API request to: {endpoint}")
+
+                # Send cached validators so unchanged payloads come back as a
+                # body-less 304
+                response = await session.get(
+                    endpoint,
+                    headers=self._conditional_headers(endpoint)
+                )
+
+                if response.status_code == 304:
+                    logger.info(f"Endpoint {endpoint} not modified since last extraction")
+                    return {
+                        'endpoint': endpoint,
+                        'data': None,
+                        'status_code': 304,
+                        'not_modified': True
+                    }
+
+                response.raise_for_status()
+                json_data = orjson.loads(response.content)
+                logger.info(f"Successfully retrieved data from {endpoint} (Status: {response.status_code})")
+                return {
+                    'endpoint': endpoint,
+                    'data': json_data,
+                    'status_code': response.status_code,
+                    'headers': dict(response.headers)
+                }
+
+        except httpx.TimeoutException:
+            logger.error(f"Timeout error for endpoint: {endpoint}")
+            return None
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error for endpoint {endpoint}: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error for endpoint {endpoint}: {str(e)}")
+            return None
+
+    async def _fetch_all(self, endpoints):
+        """
+        Fetch all endpoints concurrently over one HTTP/2 session
+        """
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        async with httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0)
+        ) as session:
+            tasks = [self._fetch_one(session, semaphore, endpoint) for endpoint in endpoints]
+            return await asyncio.gather(*tasks)
+
     def extract_endpoint(self, endpoint, table_name):
         """
         Extract data from a single API endpoint
@@ -92,7 +267,11 @@ class APIExtractor:
             if response_data is None:
                 logger.error(f"Failed to retrieve data from {endpoint}")
                 return False
-            
+
+            if response_data.get('not_modified'):
+                logger.info(f"Skipping load for {endpoint}: payload unchanged")
+                return True
+
             json_data = response_data['data']
             status_code = response_data['status_code']
             
@@ -107,15 +286,57 @@ class APIExtractor:
             
             if success:
                 logger.info(f"Successfully extracted data from {endpoint} to {table_name}")
+                # Remember validators only once the payload has landed, so a
+                # failed load refetches on the next run
+                self._store_validators(endpoint, response_data['headers'])
             else:
                 logger.error(f"Failed to load data from {endpoint} to {table_name}")
-                
+
             return success
-            
+
         except Exception as e:
             logger.error(f"Error extracting from endpoint {endpoint}: {str(e)}")
             return False
         
+    def extract_endpoint_stream(self, endpoint, table_name, item_path='item'):
+        """
+        Extract a large array endpoint by streaming records straight from the
+        socket into batched landing inserts, without buffering the whole body
+
+        Args:
+            item_path (str): ijson path of the records inside the response
+                             (e.g. 'item' for a top-level array, 'products.item'
+                             for an array under a 'products' key)
+        """
+        try:
+            logger.info(f"Streaming API request to: {endpoint}")
+
+            with self.session.stream('GET', endpoint) as response:
+                response.raise_for_status()
+
+                success = self.json_extractor.load_to_landing_stream(
+                    ijson.items(_ByteStream(response.iter_bytes()), item_path,
+                                use_float=True),
+                    table_name,
+                    file_name=endpoint,
+                    api_endpoint=endpoint,
+                    response_status=response.status_code
+                )
+
+            if success:
+                logger.info(f"Successfully streamed data from {endpoint} to {table_name}")
+            else:
+                logger.error(f"Failed to stream data from {endpoint} to {table_name}")
+
+            return success
+
+        except httpx.HTTPError as e:
+            logger.error(f"HTTP error for endpoint {endpoint}: {str(e)}")
+            return False
+        except Exception as e:
+            logger.error(f"Error streaming from endpoint {endpoint}: {str(e)}")
+            return False
+
     def extract_all(self):
         """
         Extract data from all configured API endpoints
@@ -124,15 +345,41 @@ class APIExtractor:
             endpoints_config = self.api_config.get('endpoints', {})
             total_endpoints = len(endpoints_config)
             successful_extractions = 0
-            
+
             logger.info(f"Starting extraction from {total_endpoints} API endpoints")
-            
-            # Loop through all endpoint mappings and process them
-            for endpoint, table_name in endpoints_config.items():
+
+            # Fetch all endpoints concurrently, then load sequentially so the
+            # psycopg2 connection is only touched from this thread
+            results = asyncio.run(self._fetch_all(list(endpoints_config)))
+
+            for result in results:
+                if result is None:
+                    continue
+
+                endpoint = result['endpoint']
+                table_name = endpoints_config[endpoint]
+
+                # Unchanged payloads already sit in the landing table
+                if result.get('not_modified'):
+                    logger.info(f"Skipping load for {endpoint}: payload unchanged")
+                    successful_extractions += 1
+                    continue
+
                 logger.info(f"Processing {endpoint} -> {table_name}")
-                
-                if self.extract_endpoint(endpoint, table_name):
+
+                success = self.json_extractor.load_to_landing(
+                    result['data'],
+                    table_name,
+                    file_name=endpoint,
+                    api_endpoint=endpoint,
+                    response_status=result['status_code']
+                )
+
+                if success:
                     successful_extractions += 1
+                    # Remember validators only once the payload has landed, so
+                    # a failed load refetches on the next run
+                    self._store_validators(endpoint, result['headers'])
                 else:
                     logger.error(f"Failed to process {endpoint}")
             
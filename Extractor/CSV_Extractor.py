@@ -3,19 +3,47 @@ CSV_Extractor.py
 Handles processing and extraction of CSV format data
 """
 
+import os
 import pandas as pd
 import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from sqlalchemy.sql import text
 from datetime import datetime
+from io import BytesIO
 import re
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _extract_file_worker(db_config, file_path, table_name):
+    """
+    Process-pool worker: parse and load one CSV file with its own database
+    connection, since psycopg2 connections cannot cross process boundaries
+    """
+    from Database_Connector import DatabaseConnector
+
+    db_connector = DatabaseConnector(db_config)
+    try:
+        extractor = CSVExtractor(db_connector)
+        return extractor.extract_from_file(file_path, table_name)
+    finally:
+        db_connector.close_connection()
+
+# Precompiled column-normalization patterns (compiled once at import)
+_RE_SEPARATORS = re.compile(r'[\s\-]+')
+_RE_CAMEL_CASE = re.compile(r'([a-z0-9])([A-Z])')
+_RE_MULTI_UNDERSCORE = re.compile(r'_+')
+
 class CSVExtractor:
+    # Files larger than this are read in chunks instead of all at once
+    STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+    # Rows per chunk when streaming a large file
+    CHUNK_SIZE = 100_000
+
     def __init__(self, db_connector):
         self.db_connector = db_connector
+        self._column_cache = {}
         
     @staticmethod
     def camel_to_snake(name):
@@ -23,16 +51,20 @@ class CSVExtractor:
         Convert camelCase or inconsistent column names to snake_case
         """
         # Replace spaces and dashes with underscores
-        name = re.sub(r'[\s\-]+', '_', name)
+        name = _RE_SEPARATORS.sub('_', name)
         # Convert camelCase to snake_case
-        name = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', name)
+        name = _RE_CAMEL_CASE.sub(r'\1_\2', name)
         # Convert to lowercase and remove extra underscores
-        name = re.sub(r'_+', '_', name.lower().strip('_'))
+        name = _RE_MULTI_UNDERSCORE.sub('_', name.lower().strip('_'))
         return name
         
-    def load_to_landing(self, df, table_name, source_file=None):
+    def load_to_landing(self, df, table_name, source_file=None, append=False):
         """
         Main method to load CSV data to landing table
+
+        Args:
+            append (bool): skip the TRUNCATE so successive chunks of one file
+                           accumulate in the table
         """
         try:
             # Get table columns from database
@@ -40,18 +72,36 @@ class CSVExtractor:
             
             # Check if table uses raw_data column (flexible approach)
             if 'raw_data' in table_columns:
-                # Store CSV data as JSON records
-                records = df.to_dict('records')
-                
+                # Stream rows as JSON records one at a time instead of
+                # materializing the whole frame as a list of dicts. Missing
+                # cells iterate as pd.NA under Arrow-backed dtypes, which the
+                # JSON serializer rejects, so they are mapped to None here
+                columns = df.columns.tolist()
+                records = (
+                    {
+                        column: (None if pd.isna(value) else value)
+                        for column, value in zip(columns, row)
+                    }
+                    for row in df.itertuples(index=False, name=None)
+                )
+
                 # Use JSON extractor for consistent handling
                 from JSON_Extractor import JSONExtractor
                 json_extractor = JSONExtractor(self.db_connector)
-                success = json_extractor.load_to_landing(records, table_name, file_name=source_file)
+                success = json_extractor.load_to_landing_stream(records, table_name, file_name=source_file)
                 
             else:
                 # Traditional structured approach
-                # Normalize column names to snake_case
-                df.columns = [self.camel_to_snake(col) for col in df.columns]
+                # Normalize column names to snake_case with vectorized Index
+                # string operations instead of a per-column Python call
+                df.columns = (
+                    df.columns
+                    .str.replace(_RE_SEPARATORS, '_', regex=True)
+                    .str.replace(_RE_CAMEL_CASE, r'\1_\2', regex=True)
+                    .str.lower()
+                    .str.replace(_RE_MULTI_UNDERSCORE, '_', regex=True)
+                    .str.strip('_')
+                )
                 
                 # Add metadata fields if they exist in table
                 if 'loaded_at' in table_columns:
@@ -67,32 +117,40 @@ class CSVExtractor:
                 # Load data to landing table using the same connection approach
                 try:
                     # Use the same connection that we used to check columns
-                    engine = self.db_connector.get_engine()
-                    if not engine:
-                        raise Exception("Failed to get SQLAlchemy engine")
-                    
-                    # Truncate table first
                     connection = self.db_connector.get_connection()
+                    if not connection:
+                        raise Exception("Failed to get database connection")
+
+                    # Truncate table first (skipped for follow-up chunks)
                     cursor = connection.cursor()
-                    cursor.execute(f"TRUNCATE TABLE {table_name}")
+                    if not append:
+                        cursor.execute(f"TRUNCATE TABLE {table_name}")
+
+                    # Stream the DataFrame through COPY FROM STDIN instead of
+                    # pandas to_sql - avoids per-row parameterized INSERTs.
+                    # Serializing straight to UTF-8 bytes skips the str buffer
+                    # and psycopg2's per-read encode during the COPY
+                    buffer = BytesIO()
+                    df_filtered.to_csv(buffer, index=False, header=False,
+                                       na_rep='\\N', encoding='utf-8')
+                    buffer.seek(0)
+
+                    copy_columns = ', '.join(f'"{col}"' for col in df_filtered.columns)
+                    copy_query = (
+                        f"COPY {table_name} ({copy_columns}) "
+                        f"FROM STDIN WITH (FORMAT CSV, NULL '\\N')"
+                    )
+                    cursor.copy_expert(copy_query, buffer)
                     connection.commit()
                     cursor.close()
-                    
-                    # Load data using pandas to_sql with proper schema handling
-                    if '.' in table_name:
-                        schema_name, table_name_only = table_name.split('.', 1)
-                        df_filtered.to_sql(table_name_only, engine, 
-                                         schema=schema_name,
-                                         if_exists='append', index=False)
-                    else:
-                        df_filtered.to_sql(table_name, engine, 
-                                         if_exists='append', index=False)
-                    
+
                     logger.info(f"Successfully loaded {len(df_filtered)} records to {table_name}")
                     success = True
-                    
+
                 except Exception as e:
                     logger.error(f"Failed to load data to {table_name}: {str(e)}")
+                    if self.db_connector.connection:
+                        self.db_connector.connection.rollback()
                     success = False
             
             if success:
@@ -111,38 +169,42 @@ class CSVExtractor:
         Get column names from database table (handles schema.table format)
         """
         try:
+            # Table structure doesn't change within a pipeline run, so avoid
+            # repeating the information_schema query per load
+            if table_name in self._column_cache:
+                return self._column_cache[table_name]
+
             connection = self.db_connector.get_connection()
             cursor = connection.cursor()
-            
-            # Handle schema.table format
-            if '.' in table_name:
-                schema_name, table_name_only = table_name.split('.', 1)
-                query = """
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_schema = %s AND table_name = %s
-                ORDER BY ordinal_position
-                """
-                cursor.execute(query, (schema_name, table_name_only))
-                logger.info(f"Querying columns for schema: {schema_name}, table: {table_name_only}")
-            else:
-                query = """
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = %s
-                ORDER BY ordinal_position
-                """
-                cursor.execute(query, (table_name,))
-                logger.info(f"Querying columns for table: {table_name}")
-            
+
+            # Read pg_catalog directly - much cheaper than the
+            # information_schema view, and regclass resolves both plain and
+            # schema-qualified names
+            query = """
+            SELECT attname
+            FROM pg_catalog.pg_attribute
+            WHERE attrelid = %s::regclass
+              AND attnum > 0
+              AND NOT attisdropped
+            ORDER BY attnum
+            """
+            cursor.execute(query, (table_name,))
+            logger.info(f"Querying columns for table: {table_name}")
+
             columns = [row[0] for row in cursor.fetchall()]
             cursor.close()
-            
+
             logger.info(f"Found columns for {table_name}: {columns}")
+            self._column_cache[table_name] = columns
             return columns
             
         except Exception as e:
             logger.error(f"Error getting table columns for {table_name}: {str(e)}")
+            # A failed lookup (e.g. missing table) aborts the transaction on
+            # the pinned connection; roll back so the caller's next statement
+            # isn't rejected with InFailedSqlTransaction
+            if self.db_connector.connection:
+                self.db_connector.connection.rollback()
             return []
         
     def extract_from_file(self, file_path, table_name):
@@ -150,13 +212,76 @@ class CSVExtractor:
         Extract data from CSV file
         """
         try:
-            df = pd.read_csv(file_path)
+            # Large files are streamed in bounded chunks so parsing overlaps
+            # the COPY into the landing table and memory stays at one chunk.
+            # The pyarrow engine doesn't support chunksize, so streaming uses
+            # the C engine with Arrow-backed dtypes
+            if os.path.getsize(file_path) > self.STREAMING_THRESHOLD_BYTES:
+                append = False
+                for chunk in pd.read_csv(file_path, chunksize=self.CHUNK_SIZE,
+                                         dtype_backend='pyarrow'):
+                    if not self.load_to_landing(chunk, table_name,
+                                                source_file=file_path, append=append):
+                        return False
+                    append = True
+                return True
+
+            # PyArrow's CSV reader is multithreaded and avoids per-cell Python
+            # string objects; fall back to the C engine if pyarrow is missing
+            try:
+                df = pd.read_csv(file_path, engine='pyarrow', dtype_backend='pyarrow')
+            except ImportError:
+                df = pd.read_csv(file_path)
+
             return self.load_to_landing(df, table_name, source_file=file_path)
             
         except Exception as e:
             logger.error(f"Error extracting from file {file_path}: {str(e)}")
             return False
         
+    def extract_many(self, file_table_pairs, max_workers=None):
+        """
+        Extract multiple CSV files in parallel worker processes - CSV parsing
+        is CPU-bound, so processes sidestep the GIL and PostgreSQL absorbs the
+        parallel COPY streams
+
+        Args:
+            file_table_pairs (list): (file_path, table_name) tuples to process
+            max_workers (int): worker process count, defaults to cpu_count
+        """
+        try:
+            if max_workers is None:
+                max_workers = os.cpu_count()
+
+            total_files = len(file_table_pairs)
+            successful_extractions = 0
+
+            logger.info(f"Starting parallel extraction of {total_files} CSV files")
+
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(_extract_file_worker, self.db_connector.db_config,
+                                    file_path, table_name): (file_path, table_name)
+                    for file_path, table_name in file_table_pairs
+                }
+
+                for future in as_completed(futures):
+                    file_path, table_name = futures[future]
+                    try:
+                        if future.result():
+                            successful_extractions += 1
+                        else:
+                            logger.error(f"Failed to process {file_path}")
+                    except Exception as e:
+                        logger.error(f"Error processing {file_path}: {str(e)}")
+
+            logger.info(f"Parallel CSV extraction completed: {successful_extractions}/{total_files} files processed successfully")
+            return successful_extractions == total_files
+
+        except Exception as e:
+            logger.error(f"Error in extract_many: {str(e)}")
+            return False
+
     def extract_from_dataframe(self, df, table_name, source_file=None):
         """
         Extract data from pandas DataFrame (for S3 objects)
@@ -4,8 +4,10 @@ Handles database connections and data loading operations
 """
 
 import psycopg2
-import pandas as pd
+import psycopg2.pool
 import logging
+import threading
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from string import Template
 
@@ -15,28 +17,84 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 class DatabaseConnector:
+    # Bounds for the shared psycopg2 connection pool
+    MIN_CONNECTIONS = 1
+    MAX_CONNECTIONS = 8
+
     def __init__(self, db_config):
         self.db_config = db_config
-        self.connection = None
         self.engine = None
-        
-    def get_connection(self):
+        self.pool = None
+        # Pinned connections are tracked per thread so concurrent extractors
+        # never share one psycopg2 connection
+        self._thread_local = threading.local()
+
+    @property
+    def connection(self):
         """
-        Provide psycopg2 connection for executing raw and complex SQL queries
+        The calling thread's pinned connection, if one has been checked out
+        """
+        return getattr(self._thread_local, 'connection', None)
+
+    def get_pool(self):
+        """
+        Provide the shared thread-safe psycopg2 connection pool
         """
         try:
-            if not self.connection:
-                self.connection = psycopg2.connect(
+            if not self.pool:
+                self.pool = psycopg2.pool.ThreadedConnectionPool(
+                    self.MIN_CONNECTIONS,
+                    self.MAX_CONNECTIONS,
                     host=self.db_config['host'],
                     database=self.db_config['database'],
                     user=self.db_config['user'],
                     password=self.db_config['password'],
                     port=self.db_config['port']
                 )
+                logger.info("psycopg2 connection pool created successfully")
+
+            return self.pool
+
+        except Exception as e:
+            logger.error(f"Failed to create psycopg2 connection pool: {str(e)}")
+            return None
+
+    @contextmanager
+    def acquire(self):
+        """
+        Check a connection out of the pool for the duration of a with-block;
+        safe to use concurrently from multiple threads
+        """
+        pool = self.get_pool()
+        if not pool:
+            raise Exception("Failed to get database connection pool")
+
+        connection = pool.getconn()
+        try:
+            yield connection
+        finally:
+            pool.putconn(connection)
+
+    def get_connection(self):
+        """
+        Provide psycopg2 connection for executing raw and complex SQL queries
+
+        Each thread gets its own connection checked out of the pool and pinned
+        for reuse, so callers on different threads never share a session
+        """
+        try:
+            connection = self.connection
+            if not connection:
+                pool = self.get_pool()
+                if not pool:
+                    raise Exception("Failed to get database connection pool")
+
+                connection = pool.getconn()
+                self._thread_local.connection = connection
                 logger.info("psycopg2 connection established successfully")
-            
-            return self.connection
-            
+
+            return connection
+
         except Exception as e:
             logger.error(f"Failed to establish psycopg2 connection: {str(e)}")
             return None
@@ -74,6 +132,10 @@ class DatabaseConnector:
         Load processed data into landing table
         """
         try:
+            # Imported here so connector-only users (e.g. the API path) don't
+            # pay the pandas import cost
+            import pandas as pd
+
             # Truncate existing data in landing table
             self.truncate_table(table_name)
             
@@ -128,9 +190,14 @@ class DatabaseConnector:
         """
         try:
             if self.connection:
-                self.connection.close()
-                logger.info("psycopg2 connection closed")
-            
+                self.pool.putconn(self.connection)
+                self._thread_local.connection = None
+
+            if self.pool:
+                self.pool.closeall()
+                self.pool = None
+                logger.info("psycopg2 connection pool closed")
+
             if self.engine:
                 self.engine.dispose()
                 logger.info("SQLAlchemy engine disposed")
@@ -3,140 +3,292 @@ JSON_Extractor.py
 Handles processing and extraction of JSON format data
 """
 
-import json
+import hashlib
+import ijson
+import orjson
 import logging
 from datetime import datetime
+from psycopg2 import sql
 from psycopg2.extras import Json
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class OrJson(Json):
+    """
+    psycopg2 Json adapter that serializes with orjson instead of stdlib json
+    """
+    def dumps(self, obj):
+        return orjson.dumps(obj).decode()
+
 class JSONExtractor:
+    # PostgreSQL parameter types for the optional metadata columns
+    _METADATA_TYPES = {
+        'loaded_at': 'timestamp',
+        'file_name': 'text',
+        'api_endpoint': 'text',
+        'request_timestamp': 'timestamp',
+        'response_status': 'integer'
+    }
+
     def __init__(self, db_connector):
         self.db_connector = db_connector
+        self._column_cache = {}
+        # (connection, table_name, columns) -> server-side prepared statement name
+        self._prepared_statements = {}
+        # (table_name, columns) -> composed single-row INSERT SQL
+        self._insert_sql_cache = {}
+
+    def _get_prepared_statement(self, cursor, table_name, columns):
+        """
+        PREPARE the jsonb fan-out insert once per (table, column shape) and
+        session, so repeated batches skip server-side parse/plan work
+        """
+        # Prepared statements live in the server session, so the cache key
+        # includes the connection - threads with their own pooled connections
+        # each prepare their own copy
+        key = (id(cursor.connection), table_name, tuple(columns))
+        statement_name = self._prepared_statements.get(key)
+
+        if statement_name is None:
+            # Derive the name from the statement shape so every extractor
+            # instance sharing a session maps the same (table, columns) to
+            # the same name instead of colliding on instance-local counters
+            digest = hashlib.md5(
+                '|'.join([table_name] + list(columns)).encode()
+            ).hexdigest()[:12]
+            statement_name = f"lnd_json_ins_{digest}"
+
+            # Another extractor on this session may already have PREPAREd
+            # this name; the deterministic name guarantees an identical body,
+            # so it is safe to reuse
+            cursor.execute(
+                "SELECT 1 FROM pg_prepared_statements WHERE name = %s",
+                (statement_name,)
+            )
+            if cursor.fetchone():
+                self._prepared_statements[key] = statement_name
+                return statement_name
+
+            param_types = ['jsonb']
+            select_params = []
+            for position, column in enumerate(columns[1:], start=2):
+                param_types.append(self._METADATA_TYPES[column])
+                select_params.append(f', ${position}')
+
+            prepare_query = sql.SQL(
+                "PREPARE {name} ({types}) AS "
+                "INSERT INTO {table} ({columns}) "
+                "SELECT elem{params} FROM jsonb_array_elements($1) AS elem"
+            ).format(
+                name=sql.Identifier(statement_name),
+                types=sql.SQL(', ').join(sql.SQL(t) for t in param_types),
+                table=sql.Identifier(*table_name.split('.')),
+                columns=sql.SQL(', ').join(map(sql.Identifier, columns)),
+                params=sql.SQL(''.join(select_params))
+            )
+            cursor.execute(prepare_query)
+            self._prepared_statements[key] = statement_name
+
+        return statement_name
+
+    def _get_insert_sql(self, cursor, table_name, columns):
+        """
+        Compose the single-row INSERT with properly quoted identifiers, cached
+        per (table, column shape) so the SQL text is byte-identical across calls
+        """
+        key = (table_name, tuple(columns))
+        query = self._insert_sql_cache.get(key)
+
+        if query is None:
+            query = sql.SQL("INSERT INTO {table} ({columns}) VALUES ({placeholders})").format(
+                table=sql.Identifier(*table_name.split('.')),
+                columns=sql.SQL(', ').join(map(sql.Identifier, columns)),
+                placeholders=sql.SQL(', ').join(sql.Placeholder() * len(columns))
+            ).as_string(cursor)
+            self._insert_sql_cache[key] = query
+
+        return query
         
+    def _build_insert_plan(self, table_columns, file_name=None, api_endpoint=None, response_status=None):
+        """
+        Resolve the target column list and their constant metadata values once
+        per payload, so the insert paths never re-check table_columns per row
+        """
+        columns = ['raw_data']
+        metadata_values = []
+        load_time = datetime.now()
+
+        if 'loaded_at' in table_columns:
+            columns.append('loaded_at')
+            metadata_values.append(load_time)
+
+        if 'file_name' in table_columns and file_name:
+            columns.append('file_name')
+            metadata_values.append(file_name)
+
+        if 'api_endpoint' in table_columns and api_endpoint:
+            columns.append('api_endpoint')
+            metadata_values.append(api_endpoint)
+
+        if 'request_timestamp' in table_columns:
+            columns.append('request_timestamp')
+            metadata_values.append(load_time)
+
+        if 'response_status' in table_columns and response_status is not None:
+            columns.append('response_status')
+            metadata_values.append(response_status)
+
+        return columns, metadata_values
+
+    def _insert_many(self, cursor, json_list, table_name, columns, metadata_values):
+        """
+        Bulk path: ship the whole array once and let PostgreSQL fan it out into
+        rows server-side - one round-trip regardless of element count. The
+        statement is prepared per (table, column shape) so the server plans it
+        once per session
+        """
+        statement_name = self._get_prepared_statement(cursor, table_name, columns)
+        placeholders = ', '.join(['%s'] * (1 + len(metadata_values)))
+        cursor.execute(
+            f"EXECUTE {statement_name} ({placeholders})",
+            [OrJson(json_list)] + metadata_values
+        )
+        return len(json_list)
+
+    def _insert_one(self, cursor, json_obj, table_name, columns, metadata_values):
+        """
+        Single-object fast path: one plain execute against the cached INSERT,
+        with no list wrapping or batching machinery
+        """
+        query = self._get_insert_sql(cursor, table_name, columns)
+        cursor.execute(query, [OrJson(json_obj)] + metadata_values)
+        return 1
+
     def load_to_landing(self, json_data, table_name, file_name=None, api_endpoint=None, response_status=None):
         """
         Main method to load JSON data directly into database with raw_data column
         """
         try:
-            # Ensure json_data is a list for consistent processing
-            if not isinstance(json_data, list):
-                json_data = [json_data]
-            
             # Get database connection
             connection = self.db_connector.get_connection()
             cursor = connection.cursor()
-            
+
             # Get table columns to check what metadata fields exist
             table_columns = self.get_table_columns(table_name)
-            
-            # Build dynamic insert query based on available columns
-            columns = ['raw_data']
-            placeholders = ['%s']
-            
-            if 'loaded_at' in table_columns:
-                columns.append('loaded_at')
-                placeholders.append('%s')
-                
-            if 'file_name' in table_columns and file_name:
-                columns.append('file_name')
-                placeholders.append('%s')
-            
-            if 'api_endpoint' in table_columns and api_endpoint:
-                columns.append('api_endpoint')
-                placeholders.append('%s')
-                
-            if 'request_timestamp' in table_columns:
-                columns.append('request_timestamp')
-                placeholders.append('%s')
-                
-            if 'response_status' in table_columns and response_status is not None:
-                columns.append('response_status')
-                placeholders.append('%s')
-            
-            # Construct the insert query
-            query = f"""
-            INSERT INTO {table_name} ({', '.join(columns)}) 
-            VALUES ({', '.join(placeholders)})
-            """
-            
-            # Prepare data for insertion
-            records_inserted = 0
-            request_time = datetime.now()
-            
-            for json_obj in json_data:
-                values = [Json(json_obj)]  # Use psycopg2.extras.Json for PostgreSQL JSON type
-                
-                if 'loaded_at' in table_columns:
-                    values.append(datetime.now())
-                    
-                if 'file_name' in table_columns and file_name:
-                    values.append(file_name)
-                    
-                if 'api_endpoint' in table_columns and api_endpoint:
-                    values.append(api_endpoint)
-                    
-                if 'request_timestamp' in table_columns:
-                    values.append(request_time)
-                    
-                if 'response_status' in table_columns and response_status is not None:
-                    values.append(response_status)
-                
-                cursor.execute(query, values)
-                records_inserted += 1
-            
+
+            # Specialize the insert once for this payload's shape
+            columns, metadata_values = self._build_insert_plan(
+                table_columns, file_name=file_name,
+                api_endpoint=api_endpoint, response_status=response_status
+            )
+
+            # Dispatch once on the payload shape to the specialized path
+            if isinstance(json_data, list):
+                records_inserted = self._insert_many(cursor, json_data, table_name,
+                                                     columns, metadata_values)
+            else:
+                records_inserted = self._insert_one(cursor, json_data, table_name,
+                                                    columns, metadata_values)
+
             # Commit the transaction
             connection.commit()
             cursor.close()
-            
+
             logger.info(f"Successfully loaded {records_inserted} JSON records to {table_name}")
             return True
-            
+
         except Exception as e:
             logger.error(f"Error in load_to_landing: {str(e)}")
             if connection:
                 connection.rollback()
+                # The rollback deallocates statements PREPAREd inside the
+                # failed transaction; drop this connection's cache entries so
+                # the next load re-checks the session and re-prepares
+                self._prepared_statements = {
+                    key: name for key, name in self._prepared_statements.items()
+                    if key[0] != id(connection)
+                }
             return False
     
+    def load_to_landing_stream(self, records, table_name, batch_size=1000,
+                               file_name=None, api_endpoint=None, response_status=None):
+        """
+        Load an iterator of JSON records in fixed-size batches so the full
+        payload is never materialized in memory
+        """
+        try:
+            batch = []
+            records_loaded = 0
+
+            for record in records:
+                batch.append(record)
+
+                if len(batch) >= batch_size:
+                    if not self.load_to_landing(batch, table_name, file_name=file_name,
+                                                api_endpoint=api_endpoint,
+                                                response_status=response_status):
+                        return False
+                    records_loaded += len(batch)
+                    batch = []
+
+            # Flush the final partial batch
+            if batch:
+                if not self.load_to_landing(batch, table_name, file_name=file_name,
+                                            api_endpoint=api_endpoint,
+                                            response_status=response_status):
+                    return False
+                records_loaded += len(batch)
+
+            logger.info(f"Successfully streamed {records_loaded} JSON records to {table_name}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error in load_to_landing_stream: {str(e)}")
+            return False
+
     def get_table_columns(self, table_name):
         """
         Get column names from database table (handles schema.table format)
         """
         try:
+            # Table structure doesn't change within a pipeline run, so avoid
+            # repeating the information_schema query per load
+            if table_name in self._column_cache:
+                return self._column_cache[table_name]
+
             connection = self.db_connector.get_connection()
             cursor = connection.cursor()
-            
-            # Handle schema.table format
-            if '.' in table_name:
-                schema_name, table_name_only = table_name.split('.', 1)
-                query = """
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_schema = %s AND table_name = %s
-                ORDER BY ordinal_position
-                """
-                cursor.execute(query, (schema_name, table_name_only))
-                logger.info(f"Querying columns for schema: {schema_name}, table: {table_name_only}")
-            else:
-                query = """
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = %s
-                ORDER BY ordinal_position
-                """
-                cursor.execute(query, (table_name,))
-                logger.info(f"Querying columns for table: {table_name}")
-            
+
+            # Read pg_catalog directly - much cheaper than the
+            # information_schema view, and regclass resolves both plain and
+            # schema-qualified names
+            query = """
+            SELECT attname
+            FROM pg_catalog.pg_attribute
+            WHERE attrelid = %s::regclass
+              AND attnum > 0
+              AND NOT attisdropped
+            ORDER BY attnum
+            """
+            cursor.execute(query, (table_name,))
+            logger.info(f"Querying columns for table: {table_name}")
+
             columns = [row[0] for row in cursor.fetchall()]
             cursor.close()
-            
+
             logger.info(f"Found columns for {table_name}: {columns}")
+            self._column_cache[table_name] = columns
             return columns
             
         except Exception as e:
             logger.error(f"Error getting table columns for {table_name}: {str(e)}")
+            # A failed lookup (e.g. missing table) aborts the transaction on
+            # the pinned connection; roll back so the caller's next statement
+            # isn't rejected with InFailedSqlTransaction
+            if self.db_connector.connection:
+                self.db_connector.connection.rollback()
             return []
         
     def extract_from_file(self, file_path, table_name):
@@ -144,9 +296,24 @@ class JSONExtractor:
         Extract data from JSON file
         """
         try:
-            with open(file_path, 'r') as file:
-                json_data = json.load(file)
-            
+            with open(file_path, 'rb') as file:
+                # Top-level arrays are parsed incrementally with ijson so large
+                # files never sit fully in memory; other shapes load whole
+                first_char = file.read(1)
+                while first_char.isspace():
+                    first_char = file.read(1)
+                file.seek(0)
+
+                if first_char == b'[':
+                    # use_float keeps JSON numbers as float - ijson's default
+                    # Decimal is rejected by the orjson insert path
+                    return self.load_to_landing_stream(
+                        ijson.items(file, 'item', use_float=True),
+                        table_name, file_name=file_path
+                    )
+
+                json_data = orjson.loads(file.read())
+
             return self.load_to_landing(json_data, table_name, file_name=file_path)
             
         except Exception as e:
@@ -158,7 +325,7 @@ class JSONExtractor:
         Extract data from JSON string (for API responses)
         """
         try:
-            json_data = json.loads(json_string)
+            json_data = orjson.loads(json_string)
             return self.load_to_landing(json_data, table_name, file_name=source_name)
             
         except Exception as e:
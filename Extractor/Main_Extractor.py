@@ -6,89 +6,131 @@ Main orchestrator script that coordinates all extraction processes
 import logging
 import yaml
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# Prefer the libyaml C parser - same semantics as SafeLoader, much faster
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 from dotenv import load_dotenv
-from string import Template
-from S3_Extractor import PublicS3Extractor
-from API_Extractor import APIExtractor
 from Database_Connector import DatabaseConnector
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=4)
+def _load_raw_yaml(config_path, mtime):
+    """
+    Parse the YAML config once per (path, mtime) - re-instantiating
+    MainExtractor reuses the parsed dict, and an edited file (new mtime)
+    invalidates the cache naturally
+    """
+    with open(config_path, 'r') as file:
+        return yaml.load(file, Loader=YamlLoader)
+
+# Database config fields and the environment variables that supply them
+_DB_ENV_FIELDS = (
+    ('host', 'DB_HOST'),
+    ('user', 'DB_USER'),
+    ('password', 'DB_PASSWORD'),
+    ('port', 'DB_PORT')
+)
+
+# Directory containing this script, computed once at import
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@lru_cache(maxsize=None)
+def _find_file(name):
+    """
+    Return the first existing path for name among the standard candidate
+    locations - cached per process since the layout can't change intra-run
+    """
+    candidates = (
+        name,  # Current working directory
+        f'../{name}',  # Parent directory
+        os.path.join(_SCRIPT_DIR, name),  # Same directory as script
+        os.path.join(_SCRIPT_DIR, '..', name)  # Parent of script directory
+    )
+
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
 class MainExtractor:
     def __init__(self, config_path=None):
         if config_path is None:
-            # Get the directory where this script is located
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Try to find config.yaml in multiple locations
-            possible_paths = [
-                'config.yaml',  # Current working directory
-                '../config.yaml',  # Parent directory
-                os.path.join(script_dir, 'config.yaml'),  # Same directory as script
-                os.path.join(script_dir, '..', 'config.yaml')  # Parent of script directory
-            ]
-            
-            config_path = None
-            for path in possible_paths:
-                if os.path.exists(path):
-                    config_path = path
-                    logger.info(f"Found config.yaml at: {path}")
-                    break
-            
+            config_path = _find_file('config.yaml')
+
             if config_path is None:
                 raise FileNotFoundError("config.yaml not found in any expected location")
+
+            logger.info(f"Found config.yaml at: {config_path}")
         
         self.config = self.load_config(config_path)
         self.db_connector = DatabaseConnector(self.config['database'])
-        self.s3_extractor = PublicS3Extractor(self.config['s3'], self.db_connector)
-        self.api_extractor = APIExtractor(self.config['api'], self.db_connector)
-        
+        self._s3_extractor = None
+        self._api_extractor = None
+
+        # Source name -> extraction handler, bound once per instance
+        self._dispatch = {
+            's3': self.extract_from_s3,
+            'api': self.extract_from_api,
+            'all': self.extract_all
+        }
+
+    @property
+    def s3_extractor(self):
+        """
+        S3 extractor, created on first use - defers the pandas import chain
+        for runs that never touch the S3 path
+        """
+        if self._s3_extractor is None:
+            from S3_Extractor import PublicS3Extractor
+            self._s3_extractor = PublicS3Extractor(self.config['s3'], self.db_connector)
+        return self._s3_extractor
+
+    @property
+    def api_extractor(self):
+        """
+        API extractor, created on first use - defers the httpx import chain
+        for runs that never touch the API path
+        """
+        if self._api_extractor is None:
+            from API_Extractor import APIExtractor
+            self._api_extractor = APIExtractor(self.config['api'], self.db_connector)
+        return self._api_extractor
+
     def load_config(self, config_path):
         """
         Load configuration with environment variable substitution
         """
         try:
-            # Get the directory where this script is located
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Try to find .env file in multiple locations
-            possible_env_paths = [
-                '.env',  # Current working directory
-                '../.env',  # Parent directory
-                os.path.join(script_dir, '.env'),  # Same directory as script
-                os.path.join(script_dir, '..', '.env')  # Parent of script directory
-            ]
-            
-            env_loaded = False
-            for env_path in possible_env_paths:
-                if os.path.exists(env_path):
-                    load_dotenv(env_path)
-                    logger.info(f"Loaded environment variables from: {env_path}")
-                    env_loaded = True
-                    break
-            
-            if not env_loaded:
+            env_path = _find_file('.env')
+
+            if env_path:
+                load_dotenv(env_path)
+                logger.info(f"Loaded environment variables from: {env_path}")
+            else:
                 load_dotenv()  # Try default locations
             
-            # Load config file
-            with open(config_path, 'r') as file:
-                config = yaml.safe_load(file)
+            # Load config file (parsed once per process and shared)
+            config = _load_raw_yaml(config_path, os.path.getmtime(config_path))
             
+            # Bind the environment mapping once instead of repeated os.getenv calls
+            env = os.environ
+
             # Substitute environment variables in database config
-            db_config = {
-                'host': os.getenv('DB_HOST'),
-                'database': config['database']['database'],
-                'user': os.getenv('DB_USER'),
-                'password': os.getenv('DB_PASSWORD'),
-                'port': os.getenv('DB_PORT')
-            }
-            
+            db_config = {field: env.get(var) for field, var in _DB_ENV_FIELDS}
+            db_config['database'] = config['database']['database']
+
             # Substitute environment variables in S3 config
             s3_config = {
-                'bucket_name': os.getenv('S3_BUCKET_NAME'),
-                'region': os.getenv('AWS_REGION'),
+                'bucket_name': env.get('S3_BUCKET_NAME'),
+                'region': env.get('AWS_REGION'),
                 'files': config['s3']['files']
             }
             
@@ -190,13 +232,17 @@ class MainExtractor:
         """
         try:
             logger.info("Starting full extraction process (S3 + API)...")
-            
-            # Extract from S3
-            s3_success = self.extract_from_s3()
-            
-            # Extract from API
-            api_success = self.extract_from_api()
-            
+
+            # The S3 and API pipelines are independent I/O workloads, so run
+            # them concurrently - the connector hands each worker thread its
+            # own pooled database connection
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                s3_future = executor.submit(self.extract_from_s3)
+                api_future = executor.submit(self.extract_from_api)
+
+                s3_success = s3_future.result()
+                api_success = api_future.result()
+
             # Overall success if both succeed
             overall_success = s3_success and api_success
             
@@ -223,16 +269,14 @@ class MainExtractor:
         """
         try:
             logger.info(f"Starting extraction process for source: {source}")
-            
-            if source.lower() == 's3':
-                return self.extract_from_s3()
-            elif source.lower() == 'api':
-                return self.extract_from_api()
-            elif source.lower() == 'all':
-                return self.extract_all()
-            else:
+
+            # Single lowercase + dict lookup instead of chained comparisons
+            handler = self._dispatch.get(source.lower())
+            if handler is None:
                 logger.error(f"Invalid source specified: {source}. Use 'all', 's3', or 'api'")
                 return False
+
+            return handler()
                 
         except Exception as e:
             logger.error(f"Error in run_extraction: {str(e)}")